@@ -1,13 +1,14 @@
 use crate::constants::*;
-use crate::image_processing::rgb_to_int;
+use crate::image_processing::pack_rgb_pixels;
 use crate::models::*;
 use crate::progress::report_progress;
-use crate::signals::get_signals_with_quality;
+use crate::signals::{get_signals_with_quality, virtual_signal};
 use flate2::write::ZlibEncoder;
 use flate2::Compression;
 use image::GenericImageView;
-use std::collections::{HashMap, HashSet};
-use std::io::Write;
+use std::borrow::Cow;
+use std::collections::HashSet;
+use std::io::{BufWriter, Write};
 use wasm_bindgen::JsValue;
 use std::sync::Arc;
 
@@ -21,22 +22,31 @@ use std::sync::Arc;
 ///
 /// A Factorio blueprint string on success.
 pub fn encode_blueprint(blueprint: &Blueprint) -> Result<String, JsValue> {
-    report_progress(80, "Encoding blueprint...");
-    let json_bytes = serde_json::to_vec(blueprint)
-        .map_err(|e| JsValue::from_str(&format!("Serialization error: {}", e)))?;
-
-    report_progress(85, "Compressing blueprint...");
-    let mut encoder = ZlibEncoder::new(Vec::new(), Compression::best());
-    encoder
-        .write_all(&json_bytes)
-        .map_err(|e| JsValue::from_str(&format!("Compression error: {}", e)))?;
+    report_progress(80, "Encoding and compressing blueprint...");
+    // Serialize straight into the compressor so the uncompressed JSON is never held
+    // in memory all at once. serde_json emits many tiny writes, so batch them into
+    // 64 KiB chunks before they reach the deflate stream.
+    let mut encoder = ZlibEncoder::new(Vec::new(), Compression::new(BLUEPRINT_COMPRESSION_LEVEL));
+    {
+        let mut writer = BufWriter::with_capacity(64 * 1024, &mut encoder);
+        serde_json::to_writer(&mut writer, blueprint)
+            .map_err(|e| JsValue::from_str(&format!("Serialization error: {}", e)))?;
+        writer
+            .flush()
+            .map_err(|e| JsValue::from_str(&format!("Compression error: {}", e)))?;
+    }
     let compressed = encoder
         .finish()
         .map_err(|e| JsValue::from_str(&format!("Compression finish error: {}", e)))?;
 
-    let b64_encoded = base64::encode(&compressed);
+    // Encode straight into the output string after the version prefix, avoiding a
+    // second full-size copy from `format!`. The string is sized for the padded
+    // base64 output up front so it never reallocates.
+    let mut blueprint_str = String::with_capacity(1 + (compressed.len() + 2) / 3 * 4);
+    blueprint_str.push('0');
+    base64::encode_config_buf(&compressed, base64::STANDARD, &mut blueprint_str);
     report_progress(100, "Blueprint generation complete. Loading to browser...");
-    Ok(format!("0{}", b64_encoded))
+    Ok(blueprint_str)
 }
 
 /// Generates timer entities and wires for the blueprint's timing mechanism.
@@ -57,8 +67,10 @@ pub fn generate_timer(
     ticks_per_frame: u32,
     frames_per_combinator: u32,
 ) -> (Vec<Entity>, Vec<Wire>) {
-    let mut entities = Vec::new();
-    let mut wires = Vec::new();
+    let (entity_count, wire_count) = if grayscale_bits > 0 { (6, 7) } else { (3, 3) };
+    let mut entities = Vec::with_capacity(entity_count);
+    let mut wires = Vec::with_capacity(wire_count);
+    let signal_t = virtual_signal(SIGNAL_T);
 
     entities.push(
         Entity::new(1,
@@ -97,17 +109,17 @@ pub fn generate_timer(
         .with_direction(DIRECTION_RIGHT)
         .with_control_behavior(ControlBehavior::Decider {
             decider_conditions: DeciderConditions {
-                conditions: vec![Condition {
-                    first_signal: Signal { type_: Arc::new(SIGNAL_TYPE_VIRTUAL.to_string()), name: Arc::new(SIGNAL_T.to_string()), quality: None },
+                conditions: Arc::new(vec![Condition {
+                    first_signal: Arc::clone(&signal_t),
                     constant: stop as i32,
                     comparator: COMPARATOR_LESS,
                     compare_type: None,
-                }],
-                outputs: vec![CombinatorOutput {
+                }]),
+                outputs: Arc::new(vec![CombinatorOutput {
                     copy_count_from_input: true,
                     constant: None,
-                    signal: Arc::from(Signal { type_: Arc::new(SIGNAL_TYPE_VIRTUAL.to_string()), name: Arc::new(SIGNAL_T.to_string()), quality: None }),
-                }],
+                    signal: Arc::clone(&signal_t),
+                }]),
             },
         })
         .with_description("[virtual-signal=signal-T] is our timer that ticks up 60 times per second up to the max ticks for the entire gif. \
@@ -125,11 +137,11 @@ pub fn generate_timer(
         .with_direction(DIRECTION_RIGHT)
         .with_control_behavior(ControlBehavior::Arithmetic {
             arithmetic_conditions: ArithmeticConditions {
-                first_signal: Signal { type_: Arc::new(SIGNAL_TYPE_VIRTUAL.to_string()), name: Arc::new(SIGNAL_T.to_string()), quality: None },
+                first_signal: Arc::clone(&signal_t),
                 second_signal: None,
                 second_constant: Some(1),
                 operation: OPERATION_SUB,
-                output_signal: Signal { type_: Arc::new(SIGNAL_TYPE_VIRTUAL.to_string()), name: Arc::new(SIGNAL_T.to_string()), quality: None },
+                output_signal: Arc::clone(&signal_t),
             },
         }),
     );
@@ -139,6 +151,8 @@ pub fn generate_timer(
     wires.push([2, 2, 3, 2]);
 
     if grayscale_bits > 0 {
+        let signal_s = virtual_signal(SIGNAL_S);
+        let signal_each = virtual_signal(SIGNAL_EACH);
         entities.push(
             Entity::new(
                 4,
@@ -151,11 +165,11 @@ pub fn generate_timer(
             .with_direction(DIRECTION_LEFT)
             .with_control_behavior(ControlBehavior::Arithmetic {
                 arithmetic_conditions: ArithmeticConditions {
-                    first_signal: Signal { type_: Arc::new(SIGNAL_TYPE_VIRTUAL.to_string()), name: Arc::new(SIGNAL_T.to_string()), quality: None },
+                    first_signal: Arc::clone(&signal_t),
                     second_signal: None,
                     second_constant: Some((ticks_per_frame * frames_per_combinator) as i32),
                     operation: OPERATION_MOD,
-                    output_signal: Signal { type_: Arc::new(SIGNAL_TYPE_VIRTUAL.to_string()), name: Arc::new(SIGNAL_S.to_string()), quality: None },
+                    output_signal: Arc::clone(&signal_s),
                 },
             }),
         );
@@ -171,11 +185,11 @@ pub fn generate_timer(
             )
             .with_control_behavior(ControlBehavior::Arithmetic {
                 arithmetic_conditions: ArithmeticConditions {
-                    first_signal: Signal { type_: Arc::new(SIGNAL_TYPE_VIRTUAL.to_string()), name: Arc::new(SIGNAL_S.to_string()), quality: None },
+                    first_signal: Arc::clone(&signal_s),
                     second_signal: None,
                     second_constant: Some(ticks_per_frame as i32),
                     operation: OPERATION_DIV,
-                    output_signal: Signal { type_: Arc::new(SIGNAL_TYPE_VIRTUAL.to_string()), name: Arc::new(SIGNAL_F.to_string()), quality: None },
+                    output_signal: virtual_signal(SIGNAL_F),
                 },
             }),
         );
@@ -192,11 +206,11 @@ pub fn generate_timer(
             .with_direction(DIRECTION_RIGHT)
             .with_control_behavior(ControlBehavior::Arithmetic {
                 arithmetic_conditions: ArithmeticConditions {
-                    first_signal: Signal { type_: Arc::new(SIGNAL_TYPE_VIRTUAL.to_string()), name: Arc::new(SIGNAL_EACH.to_string()), quality: None },
+                    first_signal: Arc::clone(&signal_each),
                     second_signal: None,
                     second_constant: Some(grayscale_bits as i32),
                     operation: OPERATION_MUL,
-                    output_signal: Signal { type_: Arc::new(SIGNAL_TYPE_VIRTUAL.to_string()), name: Arc::new(SIGNAL_EACH.to_string()), quality: None },
+                    output_signal: Arc::clone(&signal_each),
                 },
             })
             .with_description("Calculates the bit shift necessary for the frame we should be rendering."),
@@ -242,29 +256,33 @@ pub fn generate_substations(
         QUALITY_LEGENDARY => 28,
         _ => 18,
     };
-    let mut substation_entities = Vec::new();
-    let mut substation_wires = Vec::new();
-    let mut occupied_cells = HashSet::new();
-    let mut current_entity = start_entity_number;
-    let half_coverage = ((coverage as f64) - 2.0) / 2.0;
-    let mut frame_coverage_count = (((frame_count as f64) - half_coverage) / (coverage as f64)).ceil() as u32;
-    while ((frame_count as f64) - half_coverage + (frame_coverage_count as f64 * 2.0))
-        > (frame_coverage_count as f64 * coverage as f64)
+    // Every substation carries the same quality, so share one copy of the string.
+    let quality: Option<Arc<str>> = if substation_quality.as_str() != QUALITY_NORMAL {
+        Some(Arc::from(substation_quality.as_str()))
+    } else {
+        None
+    };
+    let half_coverage = (coverage - 2) / 2;
+    let mut frame_coverage_count = substations_to_cover(frame_count, half_coverage, coverage);
+    while frame_count as i32 - half_coverage + frame_coverage_count as i32 * 2
+        > frame_coverage_count as i32 * coverage
     {
         frame_coverage_count += 1;
     }
-    let num_substations_width =
-        (((lamp_width as f64) - half_coverage) / (coverage as f64)).ceil() as u32 + 1;
-    let num_substations_height = (((lamp_height as f64) - half_coverage) / (coverage as f64)).ceil()
-        as u32
-        + 1
-        + frame_coverage_count;
+    let num_substations_width = substations_to_cover(lamp_width, half_coverage, coverage) + 1;
+    let num_substations_height =
+        substations_to_cover(lamp_height, half_coverage, coverage) + 1 + frame_coverage_count;
     let start_x = -1;
-    let start_y = -1 - (frame_coverage_count as i32 * coverage as i32);
+    let start_y = -1 - (frame_coverage_count as i32 * coverage);
+    let substation_count = (num_substations_width * num_substations_height) as usize;
+    let mut substation_entities = Vec::with_capacity(substation_count);
+    let mut substation_wires = Vec::with_capacity(2 * substation_count);
+    let mut occupied_cells = HashSet::with_capacity(4 * substation_count);
     for i in 0..num_substations_height {
         for j in 0..num_substations_width {
-            let x = start_x + (j as i32 * coverage as i32);
-            let y = start_y + (i as i32 * coverage as i32);
+            let current_entity = start_entity_number + i * num_substations_width + j;
+            let x = start_x + (j as i32 * coverage);
+            let y = start_y + (i as i32 * coverage);
             let mut entity = Entity::new(
                 current_entity,
                 SUBSTATION,
@@ -273,11 +291,7 @@ pub fn generate_substations(
                     y: y as f64,
                 },
             );
-            entity.quality = if substation_quality.as_str() != QUALITY_NORMAL {
-                Some(substation_quality.clone())
-            } else {
-                None
-            };
+            entity.quality = quality.clone();
             substation_entities.push(entity);
 
             // Mark occupied cells.
@@ -291,24 +305,67 @@ pub fn generate_substations(
             if j > 0 {
                 substation_wires.push([current_entity, 5, current_entity - 1, 5]);
             }
-            current_entity += 1;
         }
     }
     (
         substation_entities,
         substation_wires,
         occupied_cells,
-        current_entity,
+        start_entity_number + num_substations_height * num_substations_width,
     )
 }
 
+/// Number of substation spacings needed to cover `length` tiles beyond the first
+/// substation's half coverage, i.e. `ceil((length - half_coverage) / coverage)`
+/// clamped at zero, computed in integer arithmetic.
+fn substations_to_cover(length: u32, half_coverage: i32, coverage: i32) -> u32 {
+    (length as i32 - half_coverage + coverage - 1).div_euclid(coverage).max(0) as u32
+}
+
+/// Builds the time-window conditions for each decider, shared by every group.
+///
+/// # Arguments
+///
+/// * `num_frames` - Number of deciders per group.
+/// * `ticks_per_group` - Ticks each decider stays active.
+///
+/// # Returns
+///
+/// The conditions for each frame index.
+fn build_decider_conditions(num_frames: u32, ticks_per_group: u32) -> Vec<Arc<Vec<Condition>>> {
+    // Conditions shared by every decider; only the bounds differ per frame.
+    let signal_t = virtual_signal(SIGNAL_T);
+    let condition_template = [
+        Condition {
+            first_signal: Arc::clone(&signal_t),
+            constant: 0,
+            comparator: COMPARATOR_GREATER_EQUAL,
+            compare_type: None,
+        },
+        Condition {
+            first_signal: signal_t,
+            constant: 0,
+            comparator: COMPARATOR_LESS,
+            compare_type: Some(COMPARE_AND),
+        },
+    ];
+    (0..num_frames)
+        .map(|i| {
+            let mut conditions = condition_template.to_vec();
+            conditions[0].constant = (i * ticks_per_group) as i32;
+            conditions[1].constant = ((i + 1) * ticks_per_group) as i32;
+            Arc::new(conditions)
+        })
+        .collect()
+}
+
 /// Generates combinator entities and wiring for each frame group.
 ///
 /// # Arguments
 ///
-/// * `frame_outputs` - A vector of all the outputs for a frame.
+/// * `frame_outputs` - The outputs for each frame, shared between identical frames.
+/// * `decider_conditions` - Decider conditions for each frame index, shared across groups.
 /// * `occupied_y` - Set of Y coordinates occupied by substations.
-/// * `ticks_per_group` - Ticks per group.
 /// * `base_entity_number` - Starting entity number.
 /// * `base_decider_x` - Base X coordinate for decider combinators.
 /// * `base_y` - Base Y coordinate for placement.
@@ -319,9 +376,9 @@ pub fn generate_substations(
 ///
 /// A tuple containing combinator entities, their wires, and the next entity number.
 pub fn generate_frame_combinators(
-    frame_outputs: &[Vec<CombinatorOutput>],
+    frame_outputs: &[Arc<Vec<CombinatorOutput>>],
+    decider_conditions: &[Arc<Vec<Condition>>],
     occupied_y: &HashSet<i32>,
-    ticks_per_group: u32,
     base_entity_number: u32,
     base_decider_x: f64,
     base_y: f64,
@@ -334,6 +391,7 @@ pub fn generate_frame_combinators(
     let mut wires = Vec::with_capacity(num_frames * 3 + 4);
 
     if grayscale_bits > 0 {
+        let signal_each = virtual_signal(SIGNAL_EACH);
         let shifter1_x = base_decider_x;
         let shifter2_x = shifter1_x + 2.0;
         new_entities.push(
@@ -348,11 +406,11 @@ pub fn generate_frame_combinators(
             .with_direction(DIRECTION_RIGHT)
             .with_control_behavior(ControlBehavior::Arithmetic {
                 arithmetic_conditions: ArithmeticConditions {
-                    first_signal: Signal { type_: Arc::new(SIGNAL_TYPE_VIRTUAL.to_string()), name: Arc::new(SIGNAL_EACH.to_string()), quality: None },
-                    second_signal: Some(Signal { type_: Arc::new(SIGNAL_TYPE_VIRTUAL.to_string()), name: Arc::new(SIGNAL_F.to_string()), quality: None }),
+                    first_signal: Arc::clone(&signal_each),
+                    second_signal: Some(virtual_signal(SIGNAL_F)),
                     second_constant: None,
                     operation: OPERATION_SHIFT_R,
-                    output_signal: Signal { type_: Arc::new(SIGNAL_TYPE_VIRTUAL.to_string()), name: Arc::new(SIGNAL_EACH.to_string()), quality: None },
+                    output_signal: Arc::clone(&signal_each),
                 },
             }),
         );
@@ -374,11 +432,11 @@ pub fn generate_frame_combinators(
             .with_direction(DIRECTION_RIGHT)
             .with_control_behavior(ControlBehavior::Arithmetic {
                 arithmetic_conditions: ArithmeticConditions {
-                    first_signal: Signal { type_: Arc::new(SIGNAL_TYPE_VIRTUAL.to_string()), name: Arc::new(SIGNAL_EACH.to_string()), quality: None },
+                    first_signal: Arc::clone(&signal_each),
                     second_signal: None,
                     second_constant: Some(if grayscale_bits == 1 { 1 } else if grayscale_bits == 4 { 15 } else { 255 }),
                     operation: OPERATION_AND,
-                    output_signal: Signal { type_: Arc::new(SIGNAL_TYPE_VIRTUAL.to_string()), name: Arc::new(SIGNAL_EACH.to_string()), quality: None },
+                    output_signal: Arc::clone(&signal_each),
                 },
             }),
         );
@@ -397,11 +455,11 @@ pub fn generate_frame_combinators(
                 .with_direction(DIRECTION_LEFT)
                 .with_control_behavior(ControlBehavior::Arithmetic {
                     arithmetic_conditions: ArithmeticConditions {
-                        first_signal: Signal { type_: Arc::new(SIGNAL_TYPE_VIRTUAL.to_string()), name: Arc::new(SIGNAL_EACH.to_string()), quality: None },
+                        first_signal: Arc::clone(&signal_each),
                         second_signal: None,
                         second_constant: Some(if grayscale_bits == 1 { 255 } else { 17 }),
                         operation: OPERATION_MUL,
-                        output_signal: Signal { type_: Arc::new(SIGNAL_TYPE_VIRTUAL.to_string()), name: Arc::new(SIGNAL_EACH.to_string()), quality: None },
+                        output_signal: Arc::clone(&signal_each),
                     },
                 }),
             );
@@ -422,8 +480,6 @@ pub fn generate_frame_combinators(
             current_y -= 2.0;
         }
         let decider_num = current_entity_number + 1;
-        let lower_bound = (i as u32 * ticks_per_group) as i32;
-        let upper_bound = ((i as u32 + 1) * ticks_per_group) as i32;
         let decider_entity = Entity::new(
             decider_num,
             DECIDER_COMBINATOR,
@@ -435,21 +491,8 @@ pub fn generate_frame_combinators(
         .with_direction(DIRECTION_RIGHT)
         .with_control_behavior(ControlBehavior::Decider {
             decider_conditions: DeciderConditions {
-                conditions: vec![
-                    Condition {
-                        first_signal: Signal { type_: Arc::new(SIGNAL_TYPE_VIRTUAL.to_string()), name: Arc::new(SIGNAL_T.to_string()), quality: None },
-                        constant: lower_bound,
-                        comparator: COMPARATOR_GREATER_EQUAL,
-                        compare_type: None,
-                    },
-                    Condition {
-                        first_signal: Signal { type_: Arc::new(SIGNAL_TYPE_VIRTUAL.to_string()), name: Arc::new(SIGNAL_T.to_string()), quality: None },
-                        constant: upper_bound,
-                        comparator: COMPARATOR_LESS,
-                        compare_type: Some(COMPARE_AND),
-                    },
-                ],
-                outputs: outputs.clone(), // Cloning the outputs once per entity.
+                conditions: Arc::clone(&decider_conditions[i]),
+                outputs: Arc::clone(outputs),
             },
         });
         new_entities.push(decider_entity);
@@ -497,7 +540,7 @@ pub fn generate_frame_combinators(
 ///
 /// A tuple with lamp entities, lamp wires, the next entity number, and the top-right lamp entity.
 pub fn generate_lamps(
-    signals: Vec<Arc<Signal>>,
+    signals: &[Arc<Signal>],
     grid_width: u32,
     grid_height: u32,
     occupied_cells: &HashSet<(i32, i32)>,
@@ -506,20 +549,33 @@ pub fn generate_lamps(
     start_y: i32,
     use_grayscale: bool,
 ) -> (Vec<Entity>, Vec<Wire>, u32, u32) {
-    let mut lamp_entities = Vec::new();
-    let mut lamp_wires = Vec::new();
+    // Sized for a full grid; cells taken by substations only leave some room unused.
+    let lamp_count = (grid_width * grid_height) as usize;
+    let mut lamp_entities = Vec::with_capacity(lamp_count);
+    let mut lamp_wires = Vec::with_capacity(lamp_count + grid_width as usize);
     let mut current_entity = start_entity_number;
-    let mut previous_entities: HashMap<i32, u32> = HashMap::new();
+    // Last lamp placed in each column, used to wire lamps vertically.
+    let mut previous_entities: Vec<Option<u32>> = vec![None; grid_width as usize];
     let mut top_right_lamp: u32 = 0;
 
+    // Mark the substation cells that fall inside this grid once, so each lamp checks a
+    // flat mask instead of hashing its coordinates.
+    let mut occupied = vec![false; (grid_width * grid_height) as usize];
+    for &(x, y) in occupied_cells {
+        let (c, r) = (x - start_x, y - start_y);
+        if c >= 0 && r >= 0 && (c as u32) < grid_width && (r as u32) < grid_height {
+            occupied[(r as u32 * grid_width + c as u32) as usize] = true;
+        }
+    }
+
     for r in 0..grid_height as i32 {
         for c in 0..grid_width as i32 {
-            let x = start_x + c;
-            let y = start_y + r;
-            if occupied_cells.contains(&(x, y)) {
+            let index = (r as u32 * grid_width + c as u32) as usize;
+            if occupied[index] {
                 continue;
             }
-            let index = (r as u32 * grid_width + c as u32) as usize;
+            let x = start_x + c;
+            let y = start_y + r;
             let signal = Arc::clone(&signals[index]);
             let colors = if use_grayscale {
                 ControlBehavior::GrayLamp {
@@ -553,11 +609,11 @@ pub fn generate_lamps(
                 top_right_lamp = current_entity;
             }
             if r > 0 {
-                if let Some(&prev_entity) = previous_entities.get(&x) {
+                if let Some(prev_entity) = previous_entities[c as usize] {
                     lamp_wires.push([current_entity, 1, prev_entity, 1]);
                 }
             }
-            previous_entities.insert(x, current_entity);
+            previous_entities[c as usize] = Some(current_entity);
             current_entity += 1;
         }
     }
@@ -569,7 +625,8 @@ pub fn generate_lamps(
 /// # Arguments
 ///
 /// * `fps` - Effective frames per second.
-/// * `sampled_frames` - Processed image frames.
+/// * `frames` - Distinct processed image frames.
+/// * `frame_indices` - Index into `frames` for each sampled output frame.
 /// * `use_dlc` - Whether to use DLC signals.
 /// * `grayscale_bits` - Number of grayscale bits (0 means color mode).
 /// * `signals` - Available signals vector.
@@ -580,7 +637,8 @@ pub fn generate_lamps(
 /// The final blueprint as a JSON value.
 pub fn update_full_blueprint(
     fps: u32,
-    sampled_frames: Vec<image::DynamicImage>,
+    frames: Vec<image::DynamicImage>,
+    frame_indices: Vec<usize>,
     use_dlc: bool,
     grayscale_bits: u32,
     substation_quality: String,
@@ -588,16 +646,16 @@ pub fn update_full_blueprint(
     report_progress(0, "Starting blueprint update");
 
     // Get signals internally.
-    let signals: Vec<Arc<Signal>> = get_signals_with_quality(use_dlc);
+    let signals: Arc<Vec<Arc<Signal>>> = get_signals_with_quality(use_dlc);
 
-    if sampled_frames.is_empty() {
+    if frame_indices.is_empty() {
         return Err(JsValue::from_str("No sampled frames"));
     }
 
     let use_grayscale = grayscale_bits > 0;
-    let total_frames = sampled_frames.len() as u32;
+    let total_frames = frame_indices.len() as u32;
     let frames_per_combinator = if grayscale_bits > 0 { 32 / grayscale_bits } else { 1 };
-    let (full_width, full_height) = sampled_frames[0].dimensions();
+    let (full_width, full_height) = frames[0].dimensions();
     let max_columns_per_group = ((signals.len() as u32) / full_height).min(full_width);
     let num_groups = (full_width as f64 / max_columns_per_group as f64).ceil() as u32;
     let max_columns_per_group = full_width / num_groups;
@@ -611,9 +669,7 @@ pub fn update_full_blueprint(
     let stop = total_frames * ticks_per_frame;
     let (timer_entities, timer_wires) = generate_timer(stop, grayscale_bits, ticks_per_frame, frames_per_combinator);
 
-    let mut all_entities = timer_entities;
-    let mut all_wires: Vec<Wire> = timer_wires;
-    let mut next_entity = all_entities
+    let mut next_entity = timer_entities
         .iter()
         .map(|e| e.entity_number)
         .max()
@@ -630,42 +686,100 @@ pub fn update_full_blueprint(
         );
 
     next_entity = next_entity_new;
+
+    // Size the combined lists for the timer, the power grid and every group's
+    // combinators, lamps and their wires, so each part is copied in exactly once.
+    let frames_per_group = (total_frames + frames_per_combinator - 1) / frames_per_combinator;
+    let group_entities = (num_groups * (frames_per_group + 3) + full_width * full_height) as usize;
+    let group_wires = (num_groups * (2 * frames_per_group + 6) + full_width * (full_height + 1)) as usize;
+    let mut all_entities: Vec<Entity> =
+        Vec::with_capacity(timer_entities.len() + substation_entities.len() + group_entities);
+    let mut all_wires: Vec<Wire> = Vec::with_capacity(timer_wires.len() + substation_wires.len() + group_wires);
+    all_entities.extend(timer_entities);
     all_entities.extend(substation_entities);
+    all_wires.extend(timer_wires);
     all_wires.extend(substation_wires);
     let substation_occupied_y: HashSet<i32> = occupied_cells.iter().map(|(_, y)| *y).collect();
     let mut previous_top_right_lamp: Option<u32> = None;
+    let decider_conditions = build_decider_conditions(frames_per_group, ticks_per_frame * frames_per_combinator);
+
+    // Quantization table for grayscale packing, shared by every chunk of every group.
+    let levels = grayscale_levels(grayscale_bits);
+
+    // Borrow each frame's pixel buffer (process_image already emits RGB8, or Luma8 in
+    // grayscale mode); groups then read their columns from it directly.
+    let rgb_frames: Vec<Cow<image::RgbImage>> = if use_grayscale {
+        Vec::new()
+    } else {
+        frames
+            .iter()
+            .map(|frame| match frame.as_rgb8() {
+                Some(rgb) => Cow::Borrowed(rgb),
+                None => Cow::Owned(frame.to_rgb8()),
+            })
+            .collect()
+    };
+    let luma_frames: Vec<Cow<image::GrayImage>> = if use_grayscale {
+        frames
+            .iter()
+            .map(|frame| match frame.as_luma8() {
+                Some(luma) => Cow::Borrowed(luma),
+                None => Cow::Owned(frame.to_luma8()),
+            })
+            .collect()
+    } else {
+        Vec::new()
+    };
 
     for group_index in 0..num_groups {
         let group_left = group_index * max_columns_per_group;
         let group_right = ((group_index + 1) * max_columns_per_group).min(full_width);
         let group_width = group_right - group_left;
-
-        let group_frames_outputs = if use_grayscale {
-            sampled_frames
-                .chunks(frames_per_combinator as usize)
-                .map(|chunk| {
-                    let cropped_frames: Vec<image::DynamicImage> = chunk
-                        .iter()
-                        .map(|frame| frame.crop_imm(group_left, 0, group_width, full_height))
-                        .collect();
-                    pack_grayscale_frames_to_outputs(&cropped_frames, signals.clone(), grayscale_bits)
-                })
-                .collect::<Result<Vec<_>, _>>()?
-        } else {
-            let mut outputs = Vec::new();
-            for frame in &sampled_frames {
-                let cropped = frame.crop_imm(group_left, 0, group_width, full_height);
-                outputs.push(frame_to_outputs(&cropped, signals.clone())?);
+        // Pixel i of every frame in this group always maps to signal i, so slice the
+        // per-pixel signals once and reuse them for each frame.
+        debug_assert!((group_width * full_height) as usize <= signals.len());
+        let group_signals = &signals[..(group_width * full_height) as usize];
+
+        let group_frames_outputs: Vec<Arc<Vec<CombinatorOutput>>> = if use_grayscale {
+            // A chunk that samples exactly the same frames as the one before it (a frame
+            // held for several chunks) shares its outputs.
+            let mut outputs: Vec<Arc<Vec<CombinatorOutput>>> = Vec::with_capacity(frames_per_group as usize);
+            let mut previous_chunk: &[usize] = &[];
+            for chunk in frame_indices.chunks(frames_per_combinator as usize) {
+                let chunk_outputs = match outputs.last() {
+                    Some(previous) if chunk == previous_chunk => Arc::clone(previous),
+                    _ => {
+                        let chunk_frames: Vec<&image::GrayImage> = chunk.iter().map(|&i| &*luma_frames[i]).collect();
+                        Arc::new(pack_grayscale_frames_to_outputs(
+                            &chunk_frames,
+                            group_left,
+                            group_width,
+                            group_signals,
+                            &levels,
+                            grayscale_bits,
+                        ))
+                    }
+                };
+                outputs.push(chunk_outputs);
+                previous_chunk = chunk;
             }
             outputs
+        } else {
+            // Convert each distinct frame once; every sample of it shares the outputs.
+            let mut packed = Vec::new();
+            let frame_outputs: Vec<Arc<Vec<CombinatorOutput>>> = rgb_frames
+                .iter()
+                .map(|frame| Arc::new(frame_to_outputs(frame, group_left, group_width, group_signals, &mut packed)))
+                .collect();
+            frame_indices.iter().map(|&i| Arc::clone(&frame_outputs[i])).collect()
         };
 
         let group_offset_x = group_index * max_columns_per_group;
         let first_connection_entity = if use_grayscale { next_entity } else { next_entity + 1 };
         let (group_combinators, mut group_comb_wires, new_next_entity) = generate_frame_combinators(
             &group_frames_outputs,
+            &decider_conditions,
             &substation_occupied_y,
-            ticks_per_frame * frames_per_combinator,
             next_entity,
             group_offset_x as f64 + 0.5,
             if grayscale_bits == 1 || grayscale_bits == 4 { -5.0 } else if grayscale_bits == 8 { -4.0 } else { -3.0 },
@@ -678,7 +792,7 @@ pub fn update_full_blueprint(
         next_entity = new_next_entity;
 
         let (group_lamps, mut group_lamp_wires, new_next_entity, top_right_lamp) = generate_lamps(
-            signals.clone(),
+            &signals,
             group_width,
             full_height,
             &occupied_cells,
@@ -719,7 +833,7 @@ pub fn update_full_blueprint(
     let blueprint = Blueprint {
         blueprint: BlueprintInner {
             icons: vec![Icon {
-                signal: Signal { type_: Arc::new(SIGNAL_TYPE_VIRTUAL.to_string()), name: Arc::new(DECIDER_COMBINATOR.to_string()), quality: None, },
+                signal: Signal { type_: SIGNAL_TYPE_VIRTUAL, name: DECIDER_COMBINATOR, quality: None, },
                 index: 1,
             }],
             entities: all_entities,
@@ -732,102 +846,113 @@ pub fn update_full_blueprint(
     Ok(blueprint)
 }
 
-/// Converts an RGB pixel to an integer using a utility function.
+/// Converts a column range of a color frame into combinator outputs, one packed RGB
+/// value per pixel.
 ///
 /// # Arguments
 ///
-/// * `r` - Red channel.
-/// * `g` - Green channel.
-/// * `b` - Blue channel.
+/// * `frame` - The full RGB frame.
+/// * `left` - First column of the group to convert.
+/// * `width` - Number of columns in the group.
+/// * `signals` - The signals to map to each pixel, one per pixel of the group.
+/// * `packed` - Scratch buffer for the packed pixel values, reused across frames.
 ///
 /// # Returns
 ///
 /// A vector of CombinatorOutputs for the frame
 pub fn frame_to_outputs(
-    frame: &image::DynamicImage,
-    signals: Vec<Arc<Signal>>,
-) -> Result<Vec<CombinatorOutput>, JsValue> {
-    let (width, height) = frame.dimensions();
-    let num_pixels = (width * height) as usize;
-    if num_pixels > signals.len() {
-        return Err(JsValue::from_str(&format!(
-            "Frame pixel count ({}) exceeds available signals ({}).",
-            num_pixels,
-            signals.len()
-        )));
+    frame: &image::RgbImage,
+    left: u32,
+    width: u32,
+    signals: &[Arc<Signal>],
+    packed: &mut Vec<u32>,
+) -> Vec<CombinatorOutput> {
+    let frame_width = frame.width();
+    // Read the group's columns straight out of each row of the full frame.
+    let start = left as usize * 3;
+    let end = start + width as usize * 3;
+    packed.clear();
+    for row in frame.as_raw().chunks_exact(frame_width as usize * 3) {
+        pack_rgb_pixels(&row[start..end], packed);
     }
-    let rgb_image = frame.to_rgb8();
-    let pixels = rgb_image.into_raw();
-    let mut outputs = Vec::with_capacity(num_pixels);
-    for (i, chunk) in pixels.chunks(3).enumerate() {
-        if chunk.len() < 3 {
-            continue;
-        }
-        let value = rgb_to_int(chunk[0], chunk[1], chunk[2]) as i32;
-        let signal = Arc::clone(&signals[i]);
-        outputs.push(CombinatorOutput {
+    packed
+        .iter()
+        .zip(signals.iter())
+        .map(|(&value, signal)| CombinatorOutput {
             copy_count_from_input: false,
-            constant: Some(value),
-            signal
-        });
-    }
-    Ok(outputs)
+            constant: Some(value as i32),
+            signal: Arc::clone(signal),
+        })
+        .collect()
 }
 
 /// Packs grayscale frames into output signals by bit-packing pixel values.
 ///
 /// # Arguments
 ///
-/// * `frames` - A slice of grayscale image frames.
-/// * `signals` - The signals to map to each pixel.
+/// * `frames` - The full grayscale frames to pack, in bit order.
+/// * `left` - First column of the group to pack.
+/// * `width` - Number of columns in the group.
+/// * `signals` - The signals to map to each pixel, one per pixel of the group.
+/// * `levels` - Lookup table from luma value to grayscale level (see `grayscale_levels`).
 /// * `grayscale_bits` - Number of bits for grayscale conversion.
 ///
 /// # Returns
 ///
-/// A vector of JSON objects representing output filters.
+/// A vector of CombinatorOutputs, one per pixel.
 pub fn pack_grayscale_frames_to_outputs(
-    frames: &[image::DynamicImage],
-    signals: Vec<Arc<Signal>>,
+    frames: &[&image::GrayImage],
+    left: u32,
+    width: u32,
+    signals: &[Arc<Signal>],
+    levels: &[u32; 256],
     grayscale_bits: u32,
-) -> Result<Vec<CombinatorOutput>, JsValue> {
-    if frames.is_empty() {
-        return Err(JsValue::from_str("No frames provided for packing"));
-    }
-    let (width, height) = frames[0].dimensions();
-    let num_pixels = (width * height) as usize;
-    if num_pixels > signals.len() {
-        return Err(JsValue::from_str(&format!(
-            "Frame pixel count ({}) exceeds available signals ({}).",
-            num_pixels,
-            signals.len()
-        )));
-    }
-    let luma_images: Vec<_> = frames.iter().map(|frame| frame.to_luma8()).collect();
-    let mut outputs = Vec::with_capacity(num_pixels);
-    for i in 0..num_pixels {
-        let mut packed_value = 0;
-        for (j, img) in luma_images.iter().enumerate() {
-            let pixel_value = img.as_raw()[i];
-            if grayscale_bits == 1 {
-                let binary_value = if pixel_value >= GRAYSCALE_THRESHOLD {
-                    1
-                } else {
-                    0
-                };
-                packed_value |= (binary_value as u32) << j;
-            } else if grayscale_bits == 4 {
-                let four_bit = pixel_value >> 4;
-                packed_value |= (four_bit as u32) << (4 * j);
-            } else if grayscale_bits == 8 {
-                packed_value |= (pixel_value as u32) << (8 * j);
+) -> Vec<CombinatorOutput> {
+    let num_pixels = signals.len();
+    let start = left as usize;
+    let end = start + width as usize;
+    // Pack one whole frame at a time, reading the group's columns straight out of each
+    // row and quantizing through the lookup table.
+    let mut packed = vec![0u32; num_pixels];
+    for (j, frame) in frames.iter().enumerate() {
+        let shift = grayscale_bits * j as u32;
+        let rows = frame.as_raw().chunks_exact(frame.width() as usize);
+        for (packed_row, row) in packed.chunks_exact_mut(width as usize).zip(rows) {
+            for (p, &v) in packed_row.iter_mut().zip(&row[start..end]) {
+                *p |= levels[v as usize] << shift;
             }
         }
-        let signal = Arc::clone(&signals[i]);
-        outputs.push(CombinatorOutput {
+    }
+    packed
+        .iter()
+        .zip(signals.iter())
+        .map(|(&value, signal)| CombinatorOutput {
             copy_count_from_input: false,
-            constant: Some(packed_value as i32),
-            signal,
-        });
+            constant: Some(value as i32),
+            signal: Arc::clone(signal),
+        })
+        .collect()
+}
+
+/// Builds a lookup table from an 8 bit luma value to its quantized grayscale level.
+///
+/// # Arguments
+///
+/// * `grayscale_bits` - Number of bits for grayscale conversion (1, 4 or 8).
+///
+/// # Returns
+///
+/// A 256 entry table of levels; all zero for unsupported bit depths.
+fn grayscale_levels(grayscale_bits: u32) -> [u32; 256] {
+    let mut levels = [0u32; 256];
+    for (v, level) in levels.iter_mut().enumerate() {
+        let v = v as u8;
+        *level = match grayscale_bits {
+            1 => (v >= GRAYSCALE_THRESHOLD) as u32,
+            4 => (v >> 4) as u32,
+            8 => v as u32,
+            _ => 0,
+        };
     }
-    Ok(outputs)
+    levels
 }
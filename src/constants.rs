@@ -19,6 +19,10 @@ pub const DIRECTION_LEFT: u32 = 12;
 /// Blueprint version constant.
 pub const BLUEPRINT_VERSION: u64 = 562949955518464;
 
+/// Deflate level for the blueprint string. The default level 6 compresses the highly
+/// repetitive blueprint JSON nearly as well as the maximum at a fraction of the CPU time.
+pub const BLUEPRINT_COMPRESSION_LEVEL: u32 = 6;
+
 /// Threshold used for binary grayscale conversion.
 pub const GRAYSCALE_THRESHOLD: u8 = 128;
 
@@ -1,6 +1,7 @@
 use image::AnimationDecoder;
+use image::buffer::ConvertBuffer;
 use image::{DynamicImage, Frame};
-use image::imageops::FilterType;
+use image::imageops;
 use rayon::prelude::*;
 use std::io::Cursor;
 use wasm_bindgen::prelude::*;
@@ -45,23 +46,24 @@ pub fn get_frames(image_data: &[u8], image_type: &str) -> Result<Vec<Frame>, JsV
 ///
 /// # Returns
 ///
-/// A tuple containing the processed frames (`DynamicImage`s) and the effective FPS.
+/// A tuple containing the distinct processed frames (`DynamicImage`s, RGB8 or Luma8 when
+/// grayscale), the index into them for each sampled output frame, and the effective FPS.
 pub fn process_image(
     image_data: &[u8],
     image_type: &str,
     max_size: u32,
     target_fps: u32,
     grayscale_bits: u32,
-) -> Result<(Vec<DynamicImage>, u32), JsValue> {
-    // First pass: decode frames and gather durations.
+) -> Result<(Vec<DynamicImage>, Vec<usize>, u32), JsValue> {
+    // First pass: decode frames and record when each one leaves the screen.
     let frame_vec = get_frames(image_data, image_type)?;
-    let mut durations = Vec::with_capacity(frame_vec.len());
+    let mut frame_end_times = Vec::with_capacity(frame_vec.len());
     let mut total_ms = 0u32;
     for frame in &frame_vec {
         let (ms, _) = frame.delay().numer_denom_ms();
         let delay = if ms == 0 { DEFAULT_FRAME_DELAY_MS } else { ms };
-        durations.push(delay);
         total_ms += delay;
+        frame_end_times.push(total_ms as f64);
     }
 
     // Compute average frame duration and derive FPS.
@@ -72,16 +74,22 @@ pub fn process_image(
     // Determine target frame count.
     let target_total_frames = ((total_ms as f64 / 1000.0) * effective_fps as f64).round() as usize;
 
-    // Sample frames based on cumulative timing.
+    // Sample frames based on cumulative timing: output frame k shows whichever source
+    // frame is still on screen at k * frame_interval.
+    let frame_interval = MS_PER_SECOND / effective_fps as f64;
+    // Sample times and frame end times both increase, so a single forward walk finds
+    // every index without searching.
     let mut sampled_indices = Vec::with_capacity(target_total_frames);
-    let mut next_target_time = 0.0;
-    let mut accumulated_time = 0.0;
-    for (i, &delay) in durations.iter().enumerate() {
-        accumulated_time += delay as f64;
-        while accumulated_time >= next_target_time && sampled_indices.len() < target_total_frames {
-            sampled_indices.push(i);
-            next_target_time += MS_PER_SECOND / effective_fps as f64;
+    let mut source = 0;
+    for k in 0..target_total_frames {
+        let time = k as f64 * frame_interval;
+        while source < frame_end_times.len() && frame_end_times[source] < time {
+            source += 1;
         }
+        if source == frame_end_times.len() {
+            break;
+        }
+        sampled_indices.push(source);
     }
     if sampled_indices.is_empty() {
         sampled_indices.push(0);
@@ -91,24 +99,58 @@ pub fn process_image(
     let scale_factor = (max_size as f64 / width as f64)
         .min(max_size as f64 / height as f64)
         .min(1.0);
-    let new_width = (width as f64 * scale_factor).round() as u32;
-    let new_height = (height as f64 * scale_factor).round() as u32;
+    // Keep at least one pixel on each side; very wide or tall images would otherwise
+    // round their short side down to zero.
+    let new_width = ((width as f64 * scale_factor).round() as u32).max(1);
+    let new_height = ((height as f64 * scale_factor).round() as u32).max(1);
+
+    // A source frame that stays on screen across several output frames is sampled more
+    // than once; resize each distinct source frame only once.
+    let mut unique_indices = sampled_indices.clone();
+    unique_indices.dedup();
 
     // Second pass: process the sampled frames in parallel.
-    let processed: Vec<DynamicImage> = sampled_indices
+    let resized_frames: Vec<DynamicImage> = unique_indices
         .par_iter()
         .map(|&i| {
-            let frame = &frame_vec[i];
-            let mut img = DynamicImage::ImageRgba8(frame.clone().into_buffer());
+            // Resize straight from the borrowed frame buffer so only the downscaled
+            // image is ever copied or converted. Frames already within max_size skip
+            // resampling entirely.
+            let source = frame_vec[i].buffer();
+            let resized;
+            let rgba = if (new_width, new_height) == (width, height) {
+                source
+            } else {
+                // Area-average downscale: every source pixel lands in exactly one target
+                // pixel, which is cheaper than Triangle filtering and avoids aliasing at
+                // the large reduction factors used here.
+                resized = imageops::thumbnail(source, new_width, new_height);
+                &resized
+            };
 
-            // Convert to grayscale if requested.
+            // Convert to grayscale if requested, otherwise drop the alpha channel so the
+            // blueprint builder can read the RGB bytes without another conversion.
             if grayscale_bits > 0 {
-                img = DynamicImage::ImageLuma8(img.to_luma8());
+                DynamicImage::ImageLuma8(rgba.convert())
+            } else {
+                DynamicImage::ImageRgb8(rgba.convert())
             }
-            img.resize(new_width, new_height, FilterType::Triangle)
         })
         .collect();
-    Ok((processed, effective_fps))
+    // The full-resolution frames are no longer needed; free them before returning.
+    drop(frame_vec);
+
+    // Map each sample to its resized frame. Both index lists are sorted, so walk them
+    // together; samples of the same source frame share one resized frame.
+    let mut frame_indices = Vec::with_capacity(sampled_indices.len());
+    let mut unique_pos = 0;
+    for &i in &sampled_indices {
+        while unique_indices[unique_pos] != i {
+            unique_pos += 1;
+        }
+        frame_indices.push(unique_pos);
+    }
+    Ok((resized_frames, frame_indices, effective_fps))
 }
 
 /// Converts an RGB pixel to a single 24 bit integer (inside a u32, I know...).
@@ -122,6 +164,20 @@ pub fn process_image(
 /// # Returns
 ///
 /// An integer representing the RGB value.
+#[inline]
 pub fn rgb_to_int(r: u8, g: u8, b: u8) -> u32 {
     ((r as u32) << 16) | ((g as u32) << 8) | (b as u32)
 }
+
+/// Packs a raw RGB buffer into 24 bit integers, one per pixel, appending them to `out`.
+///
+/// This is kept as a separate pass over contiguous bytes so it compiles down to a
+/// tight loop the compiler can unroll.
+///
+/// # Arguments
+///
+/// * `raw` - Interleaved RGB bytes.
+/// * `out` - Destination buffer, owned by the caller so it can be reused across frames.
+pub fn pack_rgb_pixels(raw: &[u8], out: &mut Vec<u32>) {
+    out.extend(raw.chunks_exact(3).map(|p| rgb_to_int(p[0], p[1], p[2])));
+}
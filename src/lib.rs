@@ -33,13 +33,14 @@ pub fn run_blueprint(
     grayscale_bits: u32,
 ) -> Result<String, JsValue> {
     // Process the image to extract frames and determine the effective FPS.
-    let (frames, fps) = image_processing::process_image(image_data, image_type, max_size, target_fps, grayscale_bits)?;
-    if frames.is_empty() {
+    let (frames, frame_indices, fps) =
+        image_processing::process_image(image_data, image_type, max_size, target_fps, grayscale_bits)?;
+    if frame_indices.is_empty() {
         return Err(JsValue::from_str("No frames sampled!"));
     }
 
     // Build the complete blueprint JSON.
-    let blueprint_json = blueprint::update_full_blueprint(fps, frames, use_dlc, grayscale_bits, substation_quality)?;
+    let blueprint_json = blueprint::update_full_blueprint(fps, frames, frame_indices, use_dlc, grayscale_bits, substation_quality)?;
 
     // Encode the blueprint into a Factorio blueprint string.
     let blueprint_str = blueprint::encode_blueprint(&blueprint_json)?;
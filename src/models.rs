@@ -1,5 +1,5 @@
 use std::sync::Arc;
-use serde::{Deserialize, Serialize};
+use serde::Serialize;
 #[derive(Serialize)]
 pub struct Blueprint {
     pub blueprint: BlueprintInner,
@@ -20,15 +20,19 @@ pub struct Icon {
     pub index: u32,
 }
 
-#[derive(Serialize, Deserialize, Clone)]
+#[derive(Serialize, Clone)]
 pub struct Signal {
     #[serde(rename = "type")]
-    pub type_: Arc<String>,
-    pub name: Arc<String>,
+    pub type_: &'static str,
+    pub name: &'static str,
     #[serde(skip_serializing_if = "Option::is_none")]
     pub quality: Option<&'static str>,
 }
 
+/// A circuit/copper connection: `[source entity, source connector, target entity, target connector]`.
+///
+/// A fixed-size array keeps wires stored inline in their `Vec` with no per-wire
+/// allocation, and serializes as a plain JSON array.
 pub type Wire = [u32; 4];
 
 #[derive(Serialize)]
@@ -43,7 +47,7 @@ pub struct Entity {
     #[serde(skip_serializing_if = "Option::is_none")]
     pub player_description: Option<&'static str>,
     #[serde(skip_serializing_if = "Option::is_none")]
-    pub quality: Option<String>,
+    pub quality: Option<Arc<str>>,
     #[serde(skip_serializing_if = "Option::is_none")]
     pub always_on: Option<bool>,
 }
@@ -143,13 +147,13 @@ pub struct Filter {
 
 #[derive(Serialize)]
 pub struct DeciderConditions {
-    pub conditions: Vec<Condition>,
-    pub outputs: Vec<CombinatorOutput>,
+    pub conditions: Arc<Vec<Condition>>,
+    pub outputs: Arc<Vec<CombinatorOutput>>,
 }
 
-#[derive(Serialize)]
+#[derive(Serialize, Clone)]
 pub struct Condition {
-    pub first_signal: Signal,
+    pub first_signal: Arc<Signal>,
     pub constant: i32,
     pub comparator: &'static str,
     #[serde(skip_serializing_if = "Option::is_none")]
@@ -166,11 +170,11 @@ pub struct CombinatorOutput {
 
 #[derive(Serialize)]
 pub struct ArithmeticConditions {
-    pub first_signal: Signal,
+    pub first_signal: Arc<Signal>,
     #[serde(skip_serializing_if = "Option::is_none")]
-    pub second_signal: Option<Signal>,
+    pub second_signal: Option<Arc<Signal>>,
     #[serde(skip_serializing_if = "Option::is_none")]
     pub second_constant: Option<i32>,
     pub operation: &'static str,
-    pub output_signal: Signal,
+    pub output_signal: Arc<Signal>,
 }
\ No newline at end of file
@@ -1,46 +1,105 @@
+use std::cell::RefCell;
+use std::collections::HashMap;
 use std::sync::Arc;
+use std::thread_local;
 use crate::constants::*;
 use crate::models::Signal;
-use serde_json::Value;
+use serde::Deserialize;
 
-/// Enhances the provided signals by associating quality levels based on DLC usage.
+thread_local! {
+    static VIRTUAL_SIGNALS: RefCell<HashMap<&'static str, Arc<Signal>>> = RefCell::new(HashMap::new());
+    /// Signal lists indexed by `use_dlc`, built on first use.
+    static SIGNALS_WITH_QUALITY: RefCell<[Option<Arc<Vec<Arc<Signal>>>>; 2]> = RefCell::new([None, None]);
+}
+
+/// Returns a shared virtual signal (e.g. `signal-T`) for use in combinator conditions.
+///
+/// The same signal is referenced by every timer and decider combinator, so each one is
+/// created once and handed out by reference count.
+///
+/// # Arguments
+///
+/// * `name` - The virtual signal name.
+///
+/// # Returns
+///
+/// A reference-counted virtual signal with no quality.
+pub fn virtual_signal(name: &'static str) -> Arc<Signal> {
+    VIRTUAL_SIGNALS.with(|signals| {
+        let mut signals = signals.borrow_mut();
+        let signal = signals.entry(name).or_insert_with(|| {
+            Arc::new(Signal {
+                type_: SIGNAL_TYPE_VIRTUAL,
+                name,
+                quality: None,
+            })
+        });
+        Arc::clone(signal)
+    })
+}
+
+/// Quality levels each signal is offered at, without and with the Space Age DLC.
+const BASE_QUALITIES: [&str; 2] = [QUALITY_NORMAL, QUALITY_UNKNOWN];
+const DLC_QUALITIES: [&str; 6] = [
+    QUALITY_NORMAL,
+    QUALITY_UNCOMMON,
+    QUALITY_RARE,
+    QUALITY_EPIC,
+    QUALITY_LEGENDARY,
+    QUALITY_UNKNOWN,
+];
+
+/// An entry of the embedded signal lists, borrowed straight from the JSON text.
+#[derive(Deserialize)]
+struct SignalEntry<'a> {
+    #[serde(rename = "type")]
+    type_: &'a str,
+    name: &'a str,
+}
+
+/// Returns every available signal at every quality level.
+///
+/// The list only depends on `use_dlc`, so it is built once per session and shared.
+///
+/// # Arguments
+///
+/// * `use_dlc` - Whether to include the Space Age signals and quality levels.
+///
+/// # Returns
+///
+/// A shared vector of signals with quality attributes.
+pub fn get_signals_with_quality(use_dlc: bool) -> Arc<Vec<Arc<Signal>>> {
+    SIGNALS_WITH_QUALITY.with(|cache| {
+        let mut cache = cache.borrow_mut();
+        let signals = cache[use_dlc as usize]
+            .get_or_insert_with(|| Arc::new(build_signals_with_quality(use_dlc)));
+        Arc::clone(signals)
+    })
+}
+
+/// Builds the signal list by pairing each embedded signal with each quality level.
 ///
 /// # Arguments
 ///
 /// * `use_dlc` - Whether to include additional quality levels.
-/// * `signals` - A vector of signal JSON objects.
 ///
 /// # Returns
 ///
-/// A new vector of signal JSON objects with added quality attributes.
-pub fn get_signals_with_quality(use_dlc: bool) -> Vec<Arc<Signal>> {
-    get_signal_list(use_dlc)
-        .into_iter()
-        .flat_map(|signal| {
-            let mut signals_vec = Vec::new();
-            let qualities = if use_dlc {
-                vec![
-                    QUALITY_NORMAL,
-                    QUALITY_UNCOMMON,
-                    QUALITY_RARE,
-                    QUALITY_EPIC,
-                    QUALITY_LEGENDARY,
-                    QUALITY_UNKNOWN,
-                ]
-            } else {
-                vec![QUALITY_NORMAL, QUALITY_UNKNOWN]
-            };
-            for quality in qualities.iter() {
-                let signal = Arc::from(Signal {
-                    type_: Arc::new(signal["type"].as_str().unwrap().to_string()),
-                    name: Arc::new(signal["name"].as_str().unwrap().to_string()),
-                    quality: Some(quality),
-                });
-                signals_vec.push(signal);
-            }
-            signals_vec
-        })
-        .collect()
+/// A new vector of signals with added quality attributes.
+fn build_signals_with_quality(use_dlc: bool) -> Vec<Arc<Signal>> {
+    let qualities: &[&'static str] = if use_dlc { &DLC_QUALITIES } else { &BASE_QUALITIES };
+    let signal_list = get_signal_list(use_dlc);
+    let mut signals = Vec::with_capacity(signal_list.len() * qualities.len());
+    for entry in &signal_list {
+        for &quality in qualities {
+            signals.push(Arc::new(Signal {
+                type_: entry.type_,
+                name: entry.name,
+                quality: Some(quality),
+            }));
+        }
+    }
+    signals
 }
 
 /// Retrieves the list of signals from the embedded JSON file.
@@ -51,8 +110,8 @@ pub fn get_signals_with_quality(use_dlc: bool) -> Vec<Arc<Signal>> {
 ///
 /// # Returns
 ///
-/// A vector of signal JSON objects.
-fn get_signal_list(use_dlc: bool) -> Vec<Value> {
+/// A vector of signal entries.
+fn get_signal_list(use_dlc: bool) -> Vec<SignalEntry<'static>> {
     let signals_json = if use_dlc {
         include_str!("data/signals-dlc.json")
     } else {